@@ -1,10 +1,10 @@
-import sys
-import argparse
+import functools
 import math
+from typing import Any, NamedTuple
 
 # Configuration for reimbursement calculations.
 # Version based on feedback.md and distilled.interviews.md
-REIMBURSEMENT_RATES = {
+REIMBURSEMENT_RATES: dict[str, Any] = {
     # Base Rates
     "PER_DIEM_RATE": 100.00,
 
@@ -25,7 +25,7 @@ REIMBURSEMENT_RATES = {
     "OPTIMAL_SPENDING_LONG_TRIP_MAX": 90.0000,
 
     # Bonuses (optimized values)
-    "CENTS_BONUS_CENTS": [49, 99],
+    "CENTS_BONUS_CENTS": (49, 99),
     "CENTS_BONUS_AMOUNT": 1,
     "FIVE_DAY_TRIP_BONUS_DAYS": 5,
     "FIVE_DAY_TRIP_BONUS_AMOUNT": 76.6963,
@@ -56,51 +56,139 @@ REIMBURSEMENT_RATES = {
 }
 
 
-def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount, debug=False):
-    debug_log = []
+class Rates(NamedTuple):
+    """
+    Immutable view of the rates with attribute access, used by the calculation itself.
+
+    Attribute lookups avoid hashing a string key on every access. Fields mirror
+    REIMBURSEMENT_RATES, so building RATES fails if the two fall out of step.
+    """
+    PER_DIEM_RATE: float
+    MILEAGE_TIER1_THRESHOLD: float
+    MILEAGE_RATE_TIER1: float
+    MILEAGE_RATE_TIER2: float
+    RECEIPT_REIMBURSEMENT_BASE_RATE: float
+    RECEIPT_DIMINISHING_RETURN_FACTOR: float
+    OPTIMAL_SPENDING_SHORT_TRIP_DAYS: int
+    OPTIMAL_SPENDING_SHORT_TRIP_MAX: float
+    OPTIMAL_SPENDING_MEDIUM_TRIP_DAYS: int
+    OPTIMAL_SPENDING_MEDIUM_TRIP_MAX: float
+    OPTIMAL_SPENDING_LONG_TRIP_MAX: float
+    CENTS_BONUS_CENTS: tuple[int, ...]
+    CENTS_BONUS_AMOUNT: float
+    FIVE_DAY_TRIP_BONUS_DAYS: int
+    FIVE_DAY_TRIP_BONUS_AMOUNT: float
+    FOUR_DAY_TRIP_BONUS_AMOUNT: float
+    SIX_DAY_TRIP_BONUS_AMOUNT: float
+    MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN: float
+    MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX: float
+    MILES_PER_DAY_EFFICIENCY_BONUS: float
+    LOW_RECEIPT_PENALTY_TRIP_DAYS: int
+    LOW_RECEIPT_PENALTY_THRESHOLD: float
+    LOW_RECEIPT_PENALTY_AMOUNT: float
+    HIGH_SPENDING_PENALTY_PERCENT: float
+    SWEET_SPOT_COMBO_DAYS: int
+    SWEET_SPOT_COMBO_MILES_PER_DAY: float
+    SWEET_SPOT_COMBO_SPENDING_PER_DAY: float
+    SWEET_SPOT_COMBO_BONUS: float
+    VACATION_PENALTY_DAYS: int
+    VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR: float
+    VACATION_PENALTY_AMOUNT: float
+    PER_DAY_ADJUSTMENT: float
+    LONG_TRIP_DEDUCTION: float
+
+
+RATES = Rates(**REIMBURSEMENT_RATES)
+
+@functools.lru_cache(maxsize=16)
+def cents_bonus_mask(cents_bonus_cents):
+    """Returns a bitmask with bit c set for each receipt cents value c that earns the cents bonus."""
+    return sum(1 << c for c in cents_bonus_cents)
+
+
+@functools.lru_cache(maxsize=16)
+def build_trip_duration_table(R):
+    """
+    Precomputes the values of R that depend only on the trip duration, indexed by days.
+
+    Each entry is (trip class, spending limit, 5-day bonus, 4-/6-day bonus), with a
+    bonus of None where it does not apply. The table runs one day past the largest
+    day threshold in R, so that last entry also holds for every longer trip.
+    """
+    last_day = max(R.OPTIMAL_SPENDING_SHORT_TRIP_DAYS, R.OPTIMAL_SPENDING_MEDIUM_TRIP_DAYS,
+                   R.FIVE_DAY_TRIP_BONUS_DAYS, 6) + 1
+    table = []
+    for days in range(last_day + 1):
+        if days <= R.OPTIMAL_SPENDING_SHORT_TRIP_DAYS:
+            trip_class, spending_limit = "short", R.OPTIMAL_SPENDING_SHORT_TRIP_MAX
+        elif days <= R.OPTIMAL_SPENDING_MEDIUM_TRIP_DAYS:
+            trip_class, spending_limit = "medium", R.OPTIMAL_SPENDING_MEDIUM_TRIP_MAX
+        else:
+            trip_class, spending_limit = "long", R.OPTIMAL_SPENDING_LONG_TRIP_MAX
 
-    # Use a shorter alias for the rates dictionary
-    R = REIMBURSEMENT_RATES
+        # 5-Day Trip Bonus (can apply even with Sweet Spot Combo)
+        five_day_bonus = R.FIVE_DAY_TRIP_BONUS_AMOUNT if days == R.FIVE_DAY_TRIP_BONUS_DAYS else None
+        # 4-Day and 6-Day Trip Bonuses (sweet spot range)
+        if days == 4:
+            range_bonus = R.FOUR_DAY_TRIP_BONUS_AMOUNT
+        elif days == 6:
+            range_bonus = R.SIX_DAY_TRIP_BONUS_AMOUNT
+        else:
+            range_bonus = None
+
+        table.append((trip_class, spending_limit, five_day_bonus, range_bonus))
+    return tuple(table)
+
+
+TRIP_DURATION_TABLE = build_trip_duration_table(RATES)
+
+
+def calculate_reimbursement(trip_duration_days: int, miles_traveled: float, total_receipts_amount: float,
+                            rates: Rates = RATES, debug: bool = False) -> float:
+    # Trace entries are (template, *values) tuples, only built when debug output is
+    # requested and only formatted when the trace is printed
+    debug_log: list[tuple] = []
+
+    # Use a shorter alias for the rates
+    R = rates
 
     # --- Initial Calculations & Helper Variables ---
     total_reimbursement = 0.0
     # Avoid division by zero for 0-day trips
-    miles_per_day = miles_traveled / trip_duration_days if trip_duration_days > 0 else 0
-    spending_per_day = total_receipts_amount / trip_duration_days if trip_duration_days > 0 else 0
-
-    # Determine spending limits early for use in multiple calculations
-    is_short_trip = trip_duration_days <= R["OPTIMAL_SPENDING_SHORT_TRIP_DAYS"]
-    is_medium_trip = R["OPTIMAL_SPENDING_SHORT_TRIP_DAYS"] < trip_duration_days <= R["OPTIMAL_SPENDING_MEDIUM_TRIP_DAYS"]
-    spending_limit = 0
-    if is_short_trip:
-        spending_limit = R["OPTIMAL_SPENDING_SHORT_TRIP_MAX"]
-    elif is_medium_trip:
-        spending_limit = R["OPTIMAL_SPENDING_MEDIUM_TRIP_MAX"]
-    else: # Long trip
-        spending_limit = R["OPTIMAL_SPENDING_LONG_TRIP_MAX"]
-
-    debug_log.append(f"INIT: Trip Duration: {trip_duration_days} days, Miles: {miles_traveled}, Receipts: ${total_receipts_amount:.2f}")
-    debug_log.append(f"INIT: Miles/Day: {miles_per_day:.2f}, Spending/Day: ${spending_per_day:.2f}")
+    miles_per_day = miles_traveled / trip_duration_days if trip_duration_days > 0 else 0.0
+    spending_per_day = total_receipts_amount / trip_duration_days if trip_duration_days > 0 else 0.0
+
+    # Look up the trip class, spending limit and duration bonuses in one table access;
+    # the table's last entry covers every longer trip
+    duration_table = TRIP_DURATION_TABLE if R is RATES else build_trip_duration_table(R)
+    trip_class, spending_limit, five_day_bonus, range_bonus = duration_table[
+        min(max(trip_duration_days, 0), len(duration_table) - 1)]
+
+    if debug:
+        debug_log.append(("INIT: Trip Duration: {} days, Miles: {}, Receipts: ${:.2f}", trip_duration_days, miles_traveled, total_receipts_amount))
+        debug_log.append(("INIT: Miles/Day: {:.2f}, Spending/Day: ${:.2f}", miles_per_day, spending_per_day))
 
     # --- 1. Per Diem Calculation ---
-    per_diem_reimbursement = trip_duration_days * R["PER_DIEM_RATE"]
+    per_diem_reimbursement = trip_duration_days * R.PER_DIEM_RATE
     total_reimbursement += per_diem_reimbursement
-    debug_log.append(f"CALC: Base Per Diem: {trip_duration_days} days * ${R['PER_DIEM_RATE']}/day = ${per_diem_reimbursement:.2f}")
+    if debug:
+        debug_log.append(("CALC: Base Per Diem: {} days * ${}/day = ${:.2f}", trip_duration_days, R.PER_DIEM_RATE, per_diem_reimbursement))
 
     # --- 2. Mileage Reimbursement (Tiered) ---
-    miles_tier1 = min(miles_traveled, R["MILEAGE_TIER1_THRESHOLD"])
+    miles_tier1 = min(miles_traveled, R.MILEAGE_TIER1_THRESHOLD)
     miles_tier2 = miles_traveled - miles_tier1
-    mileage_reimbursement = (miles_tier1 * R["MILEAGE_RATE_TIER1"]) + (miles_tier2 * R["MILEAGE_RATE_TIER2"])
+    mileage_reimbursement = (miles_tier1 * R.MILEAGE_RATE_TIER1) + (miles_tier2 * R.MILEAGE_RATE_TIER2)
     total_reimbursement += mileage_reimbursement
-    debug_log.append(f"CALC: Mileage Reimbursement (Tiered): ${mileage_reimbursement:.2f} ({miles_tier1:.1f}mi @ ${R['MILEAGE_RATE_TIER1']}/mi, {miles_tier2:.1f}mi @ ${R['MILEAGE_RATE_TIER2']}/mi)")
+    if debug:
+        debug_log.append(("CALC: Mileage Reimbursement (Tiered): ${:.2f} ({:.1f}mi @ ${}/mi, {:.1f}mi @ ${}/mi)", mileage_reimbursement, miles_tier1, R.MILEAGE_RATE_TIER1, miles_tier2, R.MILEAGE_RATE_TIER2))
 
     # --- 3. Receipt Reimbursement (with Diminishing Returns) ---
-    diminishing_rate = R["RECEIPT_REIMBURSEMENT_BASE_RATE"] * math.exp(-spending_per_day * R["RECEIPT_DIMINISHING_RETURN_FACTOR"])
+    diminishing_rate = R.RECEIPT_REIMBURSEMENT_BASE_RATE * math.exp(-spending_per_day * R.RECEIPT_DIMINISHING_RETURN_FACTOR)
     receipt_reimbursement = total_receipts_amount * diminishing_rate
     total_reimbursement += receipt_reimbursement
-    debug_log.append(f"CALC: Receipt Reimbursement: ${total_receipts_amount:.2f} * {diminishing_rate:.2%} (Rate based on ${spending_per_day:.2f}/day spending) = ${receipt_reimbursement:.2f}")
-
-    debug_log.append(f"SUBTOTAL after base calculations: ${total_reimbursement:.2f}")
+    if debug:
+        debug_log.append(("CALC: Receipt Reimbursement: ${:.2f} * {:.2%} (Rate based on ${:.2f}/day spending) = ${:.2f}", total_receipts_amount, diminishing_rate, spending_per_day, receipt_reimbursement))
+        debug_log.append(("SUBTOTAL after base calculations: ${:.2f}", total_reimbursement))
 
     # --- 4. Bonuses and Penalties based on Trip Profile ---
     # These are applied to the subtotal.
@@ -110,116 +198,147 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     vacation_penalty_applied = False
 
     # Profile: "Vacation Penalty" (Guaranteed Penalty - overrides most bonuses except sweet spot)
-    if (trip_duration_days >= R["VACATION_PENALTY_DAYS"] and
-          spending_per_day > (R["OPTIMAL_SPENDING_LONG_TRIP_MAX"] * R["VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR"])):
-        penalty = R["VACATION_PENALTY_AMOUNT"]
+    if (trip_duration_days >= R.VACATION_PENALTY_DAYS and
+          spending_per_day > (R.OPTIMAL_SPENDING_LONG_TRIP_MAX * R.VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR)):
+        penalty = R.VACATION_PENALTY_AMOUNT
         total_reimbursement -= penalty
         vacation_penalty_applied = True
-        debug_log.append(f"PENALTY: 'Vacation Penalty' profile triggered. -${penalty:.2f}")
+        if debug:
+            debug_log.append(("PENALTY: 'Vacation Penalty' profile triggered. -${:.2f}", penalty))
 
     # Apply bonuses (sweet spot can apply even with vacation penalty, others cannot)
     # Profile: "Sweet Spot Combo" (Guaranteed Bonus - can stack with other bonuses)
-    if (trip_duration_days == R["SWEET_SPOT_COMBO_DAYS"] and
-        miles_per_day >= R["SWEET_SPOT_COMBO_MILES_PER_DAY"] and
-        spending_per_day < R["SWEET_SPOT_COMBO_SPENDING_PER_DAY"]):
-        bonus = R["SWEET_SPOT_COMBO_BONUS"]
+    if (trip_duration_days == R.SWEET_SPOT_COMBO_DAYS and
+        miles_per_day >= R.SWEET_SPOT_COMBO_MILES_PER_DAY and
+        spending_per_day < R.SWEET_SPOT_COMBO_SPENDING_PER_DAY):
+        bonus = R.SWEET_SPOT_COMBO_BONUS
         total_reimbursement += bonus
-        debug_log.append(f"BONUS: 'Sweet Spot Combo' profile triggered. +${bonus:.2f}")
+        if debug:
+            debug_log.append(("BONUS: 'Sweet Spot Combo' profile triggered. +${:.2f}", bonus))
 
     # Apply other bonuses only if vacation penalty is not triggered
     if not vacation_penalty_applied:
-        # 5-Day Trip Bonus (can apply even with Sweet Spot Combo)
-        if trip_duration_days == R["FIVE_DAY_TRIP_BONUS_DAYS"]:
-            bonus = R["FIVE_DAY_TRIP_BONUS_AMOUNT"]
-            total_reimbursement += bonus
-            debug_log.append(f"BONUS: Standard 5-Day Trip. +${bonus:.2f}")
-
-        # 4-Day and 6-Day Trip Bonuses (sweet spot range)
-        if trip_duration_days == 4:
-            bonus = R["FOUR_DAY_TRIP_BONUS_AMOUNT"]
-            total_reimbursement += bonus
-            debug_log.append(f"BONUS: 4-Day Trip (sweet spot range). +${bonus:.2f}")
-        elif trip_duration_days == 6:
-            bonus = R["SIX_DAY_TRIP_BONUS_AMOUNT"]
-            total_reimbursement += bonus
-            debug_log.append(f"BONUS: 6-Day Trip (sweet spot range). +${bonus:.2f}")
+        # 5-Day Trip Bonus and 4-/6-Day sweet spot range bonuses, from the trip-duration table
+        if five_day_bonus is not None:
+            total_reimbursement += five_day_bonus
+            if debug:
+                debug_log.append(("BONUS: Standard 5-Day Trip. +${:.2f}", five_day_bonus))
+        if range_bonus is not None:
+            total_reimbursement += range_bonus
+            if debug:
+                debug_log.append(("BONUS: {}-Day Trip (sweet spot range). +${:.2f}", trip_duration_days, range_bonus))
 
         # Mileage Efficiency Bonus
-        if R["MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN"] <= miles_per_day <= R["MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX"]:
-            bonus = R["MILES_PER_DAY_EFFICIENCY_BONUS"]
+        if R.MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN <= miles_per_day <= R.MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX:
+            bonus = R.MILES_PER_DAY_EFFICIENCY_BONUS
             total_reimbursement += bonus
-            debug_log.append(f"BONUS: Mileage Efficiency in sweet spot ({miles_per_day:.2f} miles/day). +${bonus:.2f}")
+            if debug:
+                debug_log.append(("BONUS: Mileage Efficiency in sweet spot ({:.2f} miles/day). +${:.2f}", miles_per_day, bonus))
 
     # High Spending Penalty (applies regardless of vacation penalty)
-    high_spending = False
-    if is_short_trip and spending_per_day > R["OPTIMAL_SPENDING_SHORT_TRIP_MAX"]:
-        high_spending = True
-        debug_log.append(f"INFO: High daily spending detected for short trip.")
-    elif is_medium_trip and spending_per_day > R["OPTIMAL_SPENDING_MEDIUM_TRIP_MAX"]:
-        high_spending = True
-        debug_log.append(f"INFO: High daily spending detected for medium trip.")
-    elif not is_short_trip and not is_medium_trip and spending_per_day > R["OPTIMAL_SPENDING_LONG_TRIP_MAX"]:
-        high_spending = True
-        debug_log.append(f"INFO: High daily spending detected for long trip.")
-
-    if high_spending:
-        penalty_amount = total_reimbursement * R["HIGH_SPENDING_PENALTY_PERCENT"]
+    if spending_per_day > spending_limit:
+        if debug:
+            debug_log.append(("INFO: High daily spending detected for {} trip.", trip_class))
+        penalty_amount = total_reimbursement * R.HIGH_SPENDING_PENALTY_PERCENT
         total_reimbursement -= penalty_amount
-        debug_log.append(f"PENALTY: High daily spending penalty applied. -${penalty_amount:.2f}")
+        if debug:
+            debug_log.append(("PENALTY: High daily spending penalty applied. -${:.2f}", penalty_amount))
 
     # --- 5. Final Adjustments (apply universally) ---
 
     # Penalty for Low Receipts on multi-day trips
-    if (trip_duration_days >= R["LOW_RECEIPT_PENALTY_TRIP_DAYS"] and
-        0 < total_receipts_amount < R["LOW_RECEIPT_PENALTY_THRESHOLD"]):
-        penalty = R["LOW_RECEIPT_PENALTY_AMOUNT"]
+    if (trip_duration_days >= R.LOW_RECEIPT_PENALTY_TRIP_DAYS and
+        0 < total_receipts_amount < R.LOW_RECEIPT_PENALTY_THRESHOLD):
+        penalty = R.LOW_RECEIPT_PENALTY_AMOUNT
         total_reimbursement -= penalty
-        debug_log.append(f"PENALTY: Low receipts (${total_receipts_amount:.2f}) for a {trip_duration_days}-day trip. -${penalty:.2f}")
-
-    # Cents-Based Bonus
-    cents = round(total_receipts_amount * 100) % 100
-    if cents in R["CENTS_BONUS_CENTS"]:
-        bonus = R["CENTS_BONUS_AMOUNT"]
+        if debug:
+            debug_log.append(("PENALTY: Low receipts (${:.2f}) for a {}-day trip. -${:.2f}", total_receipts_amount, trip_duration_days, penalty))
+
+    # Cents-Based Bonus. Adding 0.5 and truncating rounds to the nearest cent only for non-negative
+    # receipts; the command line rejects negative amounts.
+    cents = int(total_receipts_amount * 100 + 0.5) % 100
+    if (cents_bonus_mask(R.CENTS_BONUS_CENTS) >> cents) & 1:
+        bonus = R.CENTS_BONUS_AMOUNT
         total_reimbursement += bonus
-        debug_log.append(f"BONUS: Receipt cents value is {cents}. +${bonus:.2f}")
+        if debug:
+            debug_log.append(("BONUS: Receipt cents value is {}. +${:.2f}", cents, bonus))
 
     # Adjustment for long trips without vacation penalty
     if trip_duration_days > 7 and not vacation_penalty_applied:
-        deduction = R["LONG_TRIP_DEDUCTION"]
+        deduction = R.LONG_TRIP_DEDUCTION
         total_reimbursement -= deduction
-        debug_log.append(f"ADJUSTMENT: Long trip (>{7} days) without vacation penalty. -${deduction:.2f}")
+        if debug:
+            debug_log.append(("ADJUSTMENT: Long trip (>7 days) without vacation penalty. -${:.2f}", deduction))
 
     # Per-day adjustment to align with test cases (not applied to vacation-like trips)
     if not vacation_penalty_applied:
-        adjustment_bonus = trip_duration_days * R["PER_DAY_ADJUSTMENT"]
+        adjustment_bonus = trip_duration_days * R.PER_DAY_ADJUSTMENT
         total_reimbursement += adjustment_bonus
-        debug_log.append(f"ADJUSTMENT: Per-day alignment bonus: {trip_duration_days} days * ${R['PER_DAY_ADJUSTMENT']:.4f}/day = +${adjustment_bonus:.2f}")
+        if debug:
+            debug_log.append(("ADJUSTMENT: Per-day alignment bonus: {} days * ${:.4f}/day = +${:.2f}", trip_duration_days, R.PER_DAY_ADJUSTMENT, adjustment_bonus))
 
     # --- Finalization ---
-    final_reimbursement = max(0, total_reimbursement)
-    if final_reimbursement != total_reimbursement:
-        debug_log.append(f"FINAL: Reimbursement capped at $0 (was ${total_reimbursement:.2f}).")
-
-    debug_log.append(f"FINAL: Total reimbursement: ${final_reimbursement:.2f}")
-
+    final_reimbursement = max(0.0, total_reimbursement)
     if debug:
+        if final_reimbursement != total_reimbursement:
+            debug_log.append(("FINAL: Reimbursement capped at $0 (was ${:.2f}).", total_reimbursement))
+        debug_log.append(("FINAL: Total reimbursement: ${:.2f}", final_reimbursement))
+
         print("\n--- Reimbursement Calculation Trace ---")
-        for line in debug_log:
-            print(line)
+        for template, *values in debug_log:
+            print(template.format(*values))
         print("---------------------------------------")
 
     return final_reimbursement
 
 
 if __name__ == "__main__":
+    import argparse
+    import sys
+
     parser = argparse.ArgumentParser(description="Calculate employee travel reimbursement.")
-    parser.add_argument("trip_duration_days", type=int, help="Duration of the trip in days.")
-    parser.add_argument("miles_traveled", type=float, help="Total miles traveled.")
-    parser.add_argument("total_receipts_amount", type=float, help="Total amount of receipts.")
+    parser.add_argument("trip_duration_days", type=int, nargs="?", help="Duration of the trip in days.")
+    parser.add_argument("miles_traveled", type=float, nargs="?", help="Total miles traveled.")
+    parser.add_argument("total_receipts_amount", type=float, nargs="?", help="Total amount of receipts.")
     parser.add_argument("--debug", action="store_true", help="Enable debug prints to see calculation steps.")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Read 'days miles receipts' lines from stdin and print one reimbursement per line. "
+                             "Lets a harness run many cases through a single process.")
 
     args = parser.parse_args()
 
+    if args.stdin:
+        if (args.trip_duration_days, args.miles_traveled, args.total_receipts_amount) != (None, None, None):
+            parser.error("trip_duration_days, miles_traveled and total_receipts_amount cannot be combined with --stdin")
+
+        # Output is left to stdout's buffering, so it is written in batches rather than per line
+        for line_number, line in enumerate(sys.stdin, start=1):
+            if not line.strip():
+                continue
+            try:
+                days_field, miles_field, receipts_field = line.split()
+                trip_duration_days = int(days_field)
+                miles_traveled = float(miles_field)
+                total_receipts_amount = float(receipts_field)
+            except ValueError:
+                parser.error(f"stdin line {line_number}: expected 'days miles receipts', got {line.strip()!r}")
+            if total_receipts_amount < 0:
+                parser.error(f"stdin line {line_number}: total_receipts_amount must not be negative, got {receipts_field}")
+            reimbursement_amount = calculate_reimbursement(
+                trip_duration_days,
+                miles_traveled,
+                total_receipts_amount,
+                debug=args.debug
+            )
+            if not args.debug:
+                print(f"{reimbursement_amount:.2f}")
+        sys.exit(0)
+
+    if args.total_receipts_amount is None:
+        parser.error("trip_duration_days, miles_traveled and total_receipts_amount are required without --stdin")
+    if args.total_receipts_amount < 0:
+        parser.error("total_receipts_amount must not be negative")
+
     reimbursement_amount = calculate_reimbursement(
         args.trip_duration_days,
         args.miles_traveled,
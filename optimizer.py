@@ -1,8 +1,13 @@
-import pandas as pd
 import numpy as np
-from scipy.optimize import minimize, differential_evolution, basinhopping
-from calculate_reimbursement import calculate_reimbursement, REIMBURSEMENT_RATES
+from scipy.optimize import minimize, differential_evolution, least_squares
+from scipy.stats import qmc
+from numba import njit, prange, set_num_threads
+from calculate_reimbursement import RATES, Rates, calculate_reimbursement
+from operator import attrgetter
+import functools
 import json
+import math
+import multiprocessing
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -44,23 +49,28 @@ CONSTANTS_TO_OPTIMIZE = [
 ]
 
 def load_data(file_path):
-    """Loads the reimbursement data from the public JSON file."""
+    """
+    Loads the reimbursement data from the public JSON file.
+
+    Returns a tuple of four arrays: trip days, miles traveled, receipt totals and
+    expected reimbursements.
+    """
     try:
         with open(file_path, 'r') as f:
             raw_data = json.load(f)
 
-        # Normalize the nested JSON structure into a flat list of dictionaries
-        processed_data = []
-        for item in raw_data:
-            flat_item = {
-                "trip_duration_days": item["input"]["trip_duration_days"],
-                "miles_traveled": item["input"]["miles_traveled"],
-                "total_receipts_amount": item["input"]["total_receipts_amount"],
-                "expected_reimbursement": item["expected_output"]
-            }
-            processed_data.append(flat_item)
+        # Flatten the nested JSON structure into one array per column
+        num_cases = len(raw_data)
+        days = np.fromiter((item["input"]["trip_duration_days"] for item in raw_data),
+                           dtype=np.int64, count=num_cases)
+        miles = np.fromiter((item["input"]["miles_traveled"] for item in raw_data),
+                            dtype=np.float64, count=num_cases)
+        receipts = np.fromiter((item["input"]["total_receipts_amount"] for item in raw_data),
+                               dtype=np.float64, count=num_cases)
+        expected = np.fromiter((item["expected_output"] for item in raw_data),
+                               dtype=np.float64, count=num_cases)
 
-        return pd.DataFrame(processed_data)
+        return days, miles, receipts, expected
 
     except FileNotFoundError:
         print(f"Error: Data file not found at '{file_path}'.")
@@ -72,66 +82,506 @@ def load_data(file_path):
         exit(1)
 
 
-def objective_function(new_constants, data, initial_rates_config, penalty_weight=0.01):
+# Trip classes used to pick the optimal daily spending limit
+SHORT_TRIP, MEDIUM_TRIP, LONG_TRIP = 0, 1, 2
+
+# Rates passed to the compiled kernel as one float array, in the order _reimbursement_kernel unpacks them.
+# CENTS_BONUS_CENTS is applied up front as a per-case flag (see case_features).
+KERNEL_RATE_KEYS = (
+    "PER_DIEM_RATE",
+    "MILEAGE_TIER1_THRESHOLD",
+    "MILEAGE_RATE_TIER1",
+    "MILEAGE_RATE_TIER2",
+    "RECEIPT_REIMBURSEMENT_BASE_RATE",
+    "RECEIPT_DIMINISHING_RETURN_FACTOR",
+    "OPTIMAL_SPENDING_SHORT_TRIP_MAX",
+    "OPTIMAL_SPENDING_MEDIUM_TRIP_MAX",
+    "OPTIMAL_SPENDING_LONG_TRIP_MAX",
+    "CENTS_BONUS_AMOUNT",
+    "FIVE_DAY_TRIP_BONUS_DAYS",
+    "FIVE_DAY_TRIP_BONUS_AMOUNT",
+    "FOUR_DAY_TRIP_BONUS_AMOUNT",
+    "SIX_DAY_TRIP_BONUS_AMOUNT",
+    "MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN",
+    "MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX",
+    "MILES_PER_DAY_EFFICIENCY_BONUS",
+    "LOW_RECEIPT_PENALTY_TRIP_DAYS",
+    "LOW_RECEIPT_PENALTY_THRESHOLD",
+    "LOW_RECEIPT_PENALTY_AMOUNT",
+    "HIGH_SPENDING_PENALTY_PERCENT",
+    "SWEET_SPOT_COMBO_DAYS",
+    "SWEET_SPOT_COMBO_MILES_PER_DAY",
+    "SWEET_SPOT_COMBO_SPENDING_PER_DAY",
+    "SWEET_SPOT_COMBO_BONUS",
+    "VACATION_PENALTY_DAYS",
+    "VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR",
+    "VACATION_PENALTY_AMOUNT",
+    "PER_DAY_ADJUSTMENT",
+    "LONG_TRIP_DEDUCTION",
+)
+_kernel_rates = attrgetter(*KERNEL_RATE_KEYS)
+
+# Where each optimized constant sits in the optimizer's vector and in the kernel rates
+OPTIMIZED_INDEX = {key: i for i, key in enumerate(CONSTANTS_TO_OPTIMIZE)}
+OPTIMIZED_KERNEL_POSITIONS = np.array([KERNEL_RATE_KEYS.index(key) for key in CONSTANTS_TO_OPTIMIZE])
+
+# Rates that are whole day counts: the int-typed fields of Rates. main() reports the optimized
+# ones rounded, so they are rounded before every evaluation too; otherwise a threshold of
+# 2.3 days would be scored as 3 (days are integers) but written out as 2.
+DAY_COUNT_KEYS = frozenset(key for key, field_type in Rates.__annotations__.items() if field_type is int)
+OPTIMIZED_DAY_KERNEL_POSITIONS = np.array([KERNEL_RATE_KEYS.index(key) for key in CONSTANTS_TO_OPTIMIZE
+                                           if key in DAY_COUNT_KEYS])
+
+# Position of each rate in the kernel parameter array, used by the kernels as P[<KEY>_IDX]
+PER_DIEM_RATE_IDX = KERNEL_RATE_KEYS.index("PER_DIEM_RATE")
+MILEAGE_TIER1_THRESHOLD_IDX = KERNEL_RATE_KEYS.index("MILEAGE_TIER1_THRESHOLD")
+MILEAGE_RATE_TIER1_IDX = KERNEL_RATE_KEYS.index("MILEAGE_RATE_TIER1")
+MILEAGE_RATE_TIER2_IDX = KERNEL_RATE_KEYS.index("MILEAGE_RATE_TIER2")
+RECEIPT_REIMBURSEMENT_BASE_RATE_IDX = KERNEL_RATE_KEYS.index("RECEIPT_REIMBURSEMENT_BASE_RATE")
+RECEIPT_DIMINISHING_RETURN_FACTOR_IDX = KERNEL_RATE_KEYS.index("RECEIPT_DIMINISHING_RETURN_FACTOR")
+OPTIMAL_SPENDING_SHORT_TRIP_MAX_IDX = KERNEL_RATE_KEYS.index("OPTIMAL_SPENDING_SHORT_TRIP_MAX")
+OPTIMAL_SPENDING_MEDIUM_TRIP_MAX_IDX = KERNEL_RATE_KEYS.index("OPTIMAL_SPENDING_MEDIUM_TRIP_MAX")
+OPTIMAL_SPENDING_LONG_TRIP_MAX_IDX = KERNEL_RATE_KEYS.index("OPTIMAL_SPENDING_LONG_TRIP_MAX")
+CENTS_BONUS_AMOUNT_IDX = KERNEL_RATE_KEYS.index("CENTS_BONUS_AMOUNT")
+FIVE_DAY_TRIP_BONUS_DAYS_IDX = KERNEL_RATE_KEYS.index("FIVE_DAY_TRIP_BONUS_DAYS")
+FIVE_DAY_TRIP_BONUS_AMOUNT_IDX = KERNEL_RATE_KEYS.index("FIVE_DAY_TRIP_BONUS_AMOUNT")
+FOUR_DAY_TRIP_BONUS_AMOUNT_IDX = KERNEL_RATE_KEYS.index("FOUR_DAY_TRIP_BONUS_AMOUNT")
+SIX_DAY_TRIP_BONUS_AMOUNT_IDX = KERNEL_RATE_KEYS.index("SIX_DAY_TRIP_BONUS_AMOUNT")
+MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN_IDX = KERNEL_RATE_KEYS.index("MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN")
+MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX_IDX = KERNEL_RATE_KEYS.index("MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX")
+MILES_PER_DAY_EFFICIENCY_BONUS_IDX = KERNEL_RATE_KEYS.index("MILES_PER_DAY_EFFICIENCY_BONUS")
+LOW_RECEIPT_PENALTY_TRIP_DAYS_IDX = KERNEL_RATE_KEYS.index("LOW_RECEIPT_PENALTY_TRIP_DAYS")
+LOW_RECEIPT_PENALTY_THRESHOLD_IDX = KERNEL_RATE_KEYS.index("LOW_RECEIPT_PENALTY_THRESHOLD")
+LOW_RECEIPT_PENALTY_AMOUNT_IDX = KERNEL_RATE_KEYS.index("LOW_RECEIPT_PENALTY_AMOUNT")
+HIGH_SPENDING_PENALTY_PERCENT_IDX = KERNEL_RATE_KEYS.index("HIGH_SPENDING_PENALTY_PERCENT")
+SWEET_SPOT_COMBO_DAYS_IDX = KERNEL_RATE_KEYS.index("SWEET_SPOT_COMBO_DAYS")
+SWEET_SPOT_COMBO_MILES_PER_DAY_IDX = KERNEL_RATE_KEYS.index("SWEET_SPOT_COMBO_MILES_PER_DAY")
+SWEET_SPOT_COMBO_SPENDING_PER_DAY_IDX = KERNEL_RATE_KEYS.index("SWEET_SPOT_COMBO_SPENDING_PER_DAY")
+SWEET_SPOT_COMBO_BONUS_IDX = KERNEL_RATE_KEYS.index("SWEET_SPOT_COMBO_BONUS")
+VACATION_PENALTY_DAYS_IDX = KERNEL_RATE_KEYS.index("VACATION_PENALTY_DAYS")
+VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR_IDX = KERNEL_RATE_KEYS.index("VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR")
+VACATION_PENALTY_AMOUNT_IDX = KERNEL_RATE_KEYS.index("VACATION_PENALTY_AMOUNT")
+PER_DAY_ADJUSTMENT_IDX = KERNEL_RATE_KEYS.index("PER_DAY_ADJUSTMENT")
+LONG_TRIP_DEDUCTION_IDX = KERNEL_RATE_KEYS.index("LONG_TRIP_DEDUCTION")
+
+
+def classify_trips(days, R):
+    """
+    Returns the trip class (SHORT_TRIP, MEDIUM_TRIP or LONG_TRIP) of each case.
+
+    The class only depends on the trip-duration day thresholds, which are not
+    optimized, so it can be computed once per dataset instead of per evaluation.
+    """
+    return np.where(days <= R.OPTIMAL_SPENDING_SHORT_TRIP_DAYS, SHORT_TRIP,
+                    np.where(days <= R.OPTIMAL_SPENDING_MEDIUM_TRIP_DAYS, MEDIUM_TRIP, LONG_TRIP))
+
+
+def case_features(days, miles, receipts, R):
     """
-    Objective function that matches eval.sh calculation exactly.
+    Returns the per-case values the kernel needs that do not depend on the optimized rates.
+
+    The tuple is (miles_per_day, spending_per_day, trip_class, cents_bonus), computed
+    exactly as calculate_reimbursement does, so each evaluation skips the divisions and
+    the cents rounding.
     """
-    # Create a mutable copy of the rates configuration
-    current_rates = initial_rates_config.copy()
+    miles_per_day = np.divide(miles, days, out=np.zeros_like(miles), where=days > 0)
+    spending_per_day = np.divide(receipts, days, out=np.zeros_like(receipts), where=days > 0)
+    cents = (receipts * 100 + 0.5).astype(np.int64) % 100
+    cents_bonus = np.isin(cents, R.CENTS_BONUS_CENTS)
+    return miles_per_day, spending_per_day, classify_trips(days, R), cents_bonus
 
-    # Update the rates with the new values from the optimizer
-    for i, key in enumerate(CONSTANTS_TO_OPTIMIZE):
-        current_rates[key] = new_constants[i]
 
-    # Add constraint penalties for logical relationships (much smaller weight)
-    penalty = 0
+@njit(cache=True)
+def _reimbursement_kernel(trip_duration_days, miles_traveled, total_receipts_amount,
+                          miles_per_day, spending_per_day, trip_class, cents_bonus, kernel_params):
+    """
+    Compiled port of calculate_reimbursement.calculate_reimbursement for a single case.
+
+    Rates are passed as one float array in KERNEL_RATE_KEYS order (see kernel_params)
+    and read through the *_IDX positions, since Numba cannot compile against the Rates
+    tuple. Must be kept in sync with the scalar implementation.
+    """
+    P = kernel_params
+
+    total_reimbursement = 0.0
+
+    if trip_class == SHORT_TRIP:
+        spending_limit = P[OPTIMAL_SPENDING_SHORT_TRIP_MAX_IDX]
+    elif trip_class == MEDIUM_TRIP:
+        spending_limit = P[OPTIMAL_SPENDING_MEDIUM_TRIP_MAX_IDX]
+    else:
+        spending_limit = P[OPTIMAL_SPENDING_LONG_TRIP_MAX_IDX]
+
+    # --- 1-3. Per diem, tiered mileage and diminishing receipt reimbursement ---
+    total_reimbursement += trip_duration_days * P[PER_DIEM_RATE_IDX]
+    miles_tier1 = min(miles_traveled, P[MILEAGE_TIER1_THRESHOLD_IDX])
+    miles_tier2 = miles_traveled - miles_tier1
+    total_reimbursement += (miles_tier1 * P[MILEAGE_RATE_TIER1_IDX]) + (miles_tier2 * P[MILEAGE_RATE_TIER2_IDX])
+    diminishing_rate = P[RECEIPT_REIMBURSEMENT_BASE_RATE_IDX] * math.exp(-spending_per_day * P[RECEIPT_DIMINISHING_RETURN_FACTOR_IDX])
+    total_reimbursement += total_receipts_amount * diminishing_rate
+
+    # --- 4. Bonuses and penalties based on trip profile ---
+    # Each rule is a 0/1 mask times its amount rather than a branch, so the case loop has
+    # no data-dependent jumps. For finite rates, rules that do not apply add an exact 0.0, in
+    # the same order as the scalar model, so results are bit-identical to it. An infinite
+    # amount is not: inf * False is NaN, where the scalar model skips the rule.
+    vacation_penalty_applied = ((trip_duration_days >= P[VACATION_PENALTY_DAYS_IDX]) &
+                                (spending_per_day > (P[OPTIMAL_SPENDING_LONG_TRIP_MAX_IDX] * P[VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR_IDX])))
+    total_reimbursement -= P[VACATION_PENALTY_AMOUNT_IDX] * vacation_penalty_applied
+
+    sweet_spot = ((trip_duration_days == P[SWEET_SPOT_COMBO_DAYS_IDX]) &
+                  (miles_per_day >= P[SWEET_SPOT_COMBO_MILES_PER_DAY_IDX]) &
+                  (spending_per_day < P[SWEET_SPOT_COMBO_SPENDING_PER_DAY_IDX]))
+    total_reimbursement += P[SWEET_SPOT_COMBO_BONUS_IDX] * sweet_spot
+
+    regular_trip = not vacation_penalty_applied
+    total_reimbursement += P[FIVE_DAY_TRIP_BONUS_AMOUNT_IDX] * (regular_trip & (trip_duration_days == P[FIVE_DAY_TRIP_BONUS_DAYS_IDX]))
+    total_reimbursement += P[FOUR_DAY_TRIP_BONUS_AMOUNT_IDX] * (regular_trip & (trip_duration_days == 4))
+    total_reimbursement += P[SIX_DAY_TRIP_BONUS_AMOUNT_IDX] * (regular_trip & (trip_duration_days == 6))
+    efficient = ((P[MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN_IDX] <= miles_per_day) &
+                 (miles_per_day <= P[MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX_IDX]))
+    total_reimbursement += P[MILES_PER_DAY_EFFICIENCY_BONUS_IDX] * (regular_trip & efficient)
+
+    total_reimbursement -= total_reimbursement * P[HIGH_SPENDING_PENALTY_PERCENT_IDX] * (spending_per_day > spending_limit)
+
+    # --- 5. Final adjustments ---
+    low_receipts = ((trip_duration_days >= P[LOW_RECEIPT_PENALTY_TRIP_DAYS_IDX]) &
+                    (0 < total_receipts_amount) & (total_receipts_amount < P[LOW_RECEIPT_PENALTY_THRESHOLD_IDX]))
+    total_reimbursement -= P[LOW_RECEIPT_PENALTY_AMOUNT_IDX] * low_receipts
+
+    total_reimbursement += P[CENTS_BONUS_AMOUNT_IDX] * cents_bonus
+
+    total_reimbursement -= P[LONG_TRIP_DEDUCTION_IDX] * (regular_trip & (trip_duration_days > 7))
+    total_reimbursement += trip_duration_days * P[PER_DAY_ADJUSTMENT_IDX] * regular_trip
+
+    return max(0.0, total_reimbursement)
+
+
+@njit(cache=True)
+def _reimbursement_kernel_grad(trip_duration_days, miles_traveled, total_receipts_amount,
+                               miles_per_day, spending_per_day, trip_class, cents_bonus, kernel_params, grad):
+    """
+    _reimbursement_kernel that also writes the reimbursement's gradient into grad.
+
+    grad has one entry per kernel parameter (KERNEL_RATE_KEYS order). Threshold-style
+    parameters only move the result in steps, so their derivative is zero almost
+    everywhere; the tier-1 mileage threshold is the exception, as it is continuous.
+    Must be kept in sync with _reimbursement_kernel.
+    """
+    P = kernel_params
+    grad[:] = 0.0
+
+    total_reimbursement = 0.0
+
+    if trip_class == SHORT_TRIP:
+        spending_limit = P[OPTIMAL_SPENDING_SHORT_TRIP_MAX_IDX]
+    elif trip_class == MEDIUM_TRIP:
+        spending_limit = P[OPTIMAL_SPENDING_MEDIUM_TRIP_MAX_IDX]
+    else:
+        spending_limit = P[OPTIMAL_SPENDING_LONG_TRIP_MAX_IDX]
+
+    # --- 1-3. Per diem, tiered mileage and diminishing receipt reimbursement ---
+    total_reimbursement += trip_duration_days * P[PER_DIEM_RATE_IDX]
+    grad[PER_DIEM_RATE_IDX] = trip_duration_days
+    miles_tier1 = min(miles_traveled, P[MILEAGE_TIER1_THRESHOLD_IDX])
+    miles_tier2 = miles_traveled - miles_tier1
+    total_reimbursement += (miles_tier1 * P[MILEAGE_RATE_TIER1_IDX]) + (miles_tier2 * P[MILEAGE_RATE_TIER2_IDX])
+    grad[MILEAGE_RATE_TIER1_IDX] = miles_tier1
+    grad[MILEAGE_RATE_TIER2_IDX] = miles_tier2
+    if miles_traveled > P[MILEAGE_TIER1_THRESHOLD_IDX]:
+        grad[MILEAGE_TIER1_THRESHOLD_IDX] = P[MILEAGE_RATE_TIER1_IDX] - P[MILEAGE_RATE_TIER2_IDX]
+    decay = math.exp(-spending_per_day * P[RECEIPT_DIMINISHING_RETURN_FACTOR_IDX])
+    diminishing_rate = P[RECEIPT_REIMBURSEMENT_BASE_RATE_IDX] * decay
+    total_reimbursement += total_receipts_amount * diminishing_rate
+    grad[RECEIPT_REIMBURSEMENT_BASE_RATE_IDX] = total_receipts_amount * decay
+    grad[RECEIPT_DIMINISHING_RETURN_FACTOR_IDX] = -total_receipts_amount * diminishing_rate * spending_per_day
+
+    # --- 4. Bonuses and penalties based on trip profile ---
+    vacation_penalty_applied = False
+    if (trip_duration_days >= P[VACATION_PENALTY_DAYS_IDX] and
+            spending_per_day > (P[OPTIMAL_SPENDING_LONG_TRIP_MAX_IDX] * P[VACATION_PENALTY_SPENDING_THRESHOLD_FACTOR_IDX])):
+        total_reimbursement -= P[VACATION_PENALTY_AMOUNT_IDX]
+        grad[VACATION_PENALTY_AMOUNT_IDX] = -1.0
+        vacation_penalty_applied = True
+
+    if (trip_duration_days == P[SWEET_SPOT_COMBO_DAYS_IDX] and
+            miles_per_day >= P[SWEET_SPOT_COMBO_MILES_PER_DAY_IDX] and
+            spending_per_day < P[SWEET_SPOT_COMBO_SPENDING_PER_DAY_IDX]):
+        total_reimbursement += P[SWEET_SPOT_COMBO_BONUS_IDX]
+        grad[SWEET_SPOT_COMBO_BONUS_IDX] = 1.0
+
+    if not vacation_penalty_applied:
+        if trip_duration_days == P[FIVE_DAY_TRIP_BONUS_DAYS_IDX]:
+            total_reimbursement += P[FIVE_DAY_TRIP_BONUS_AMOUNT_IDX]
+            grad[FIVE_DAY_TRIP_BONUS_AMOUNT_IDX] = 1.0
+        if trip_duration_days == 4:
+            total_reimbursement += P[FOUR_DAY_TRIP_BONUS_AMOUNT_IDX]
+            grad[FOUR_DAY_TRIP_BONUS_AMOUNT_IDX] = 1.0
+        elif trip_duration_days == 6:
+            total_reimbursement += P[SIX_DAY_TRIP_BONUS_AMOUNT_IDX]
+            grad[SIX_DAY_TRIP_BONUS_AMOUNT_IDX] = 1.0
+        if P[MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN_IDX] <= miles_per_day <= P[MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX_IDX]:
+            total_reimbursement += P[MILES_PER_DAY_EFFICIENCY_BONUS_IDX]
+            grad[MILES_PER_DAY_EFFICIENCY_BONUS_IDX] = 1.0
+
+    if spending_per_day > spending_limit:
+        # Scales everything so far by (1 - percent)
+        for k in range(grad.shape[0]):
+            grad[k] *= 1.0 - P[HIGH_SPENDING_PENALTY_PERCENT_IDX]
+        grad[HIGH_SPENDING_PENALTY_PERCENT_IDX] = -total_reimbursement
+        total_reimbursement -= total_reimbursement * P[HIGH_SPENDING_PENALTY_PERCENT_IDX]
+
+    # --- 5. Final adjustments ---
+    if (trip_duration_days >= P[LOW_RECEIPT_PENALTY_TRIP_DAYS_IDX] and
+            0 < total_receipts_amount < P[LOW_RECEIPT_PENALTY_THRESHOLD_IDX]):
+        total_reimbursement -= P[LOW_RECEIPT_PENALTY_AMOUNT_IDX]
+        grad[LOW_RECEIPT_PENALTY_AMOUNT_IDX] = -1.0
+
+    if cents_bonus:
+        total_reimbursement += P[CENTS_BONUS_AMOUNT_IDX]
+        grad[CENTS_BONUS_AMOUNT_IDX] = 1.0
+
+    if trip_duration_days > 7 and not vacation_penalty_applied:
+        total_reimbursement -= P[LONG_TRIP_DEDUCTION_IDX]
+        grad[LONG_TRIP_DEDUCTION_IDX] = -1.0
+    if not vacation_penalty_applied:
+        total_reimbursement += trip_duration_days * P[PER_DAY_ADJUSTMENT_IDX]
+        grad[PER_DAY_ADJUSTMENT_IDX] = trip_duration_days
+
+    if total_reimbursement < 0.0:
+        grad[:] = 0.0
+    return max(0.0, total_reimbursement)
+
+
+@njit(parallel=True, cache=True)
+def _reimbursement_batch(days, miles, receipts, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                         kernel_params):
+    """Evaluates _reimbursement_kernel over every case in parallel."""
+    calculated = np.empty(days.shape[0])
+    for i in prange(days.shape[0]):
+        calculated[i] = _reimbursement_kernel(days[i], miles[i], receipts[i], miles_per_day[i], spending_per_day[i],
+                                              trip_class[i], cents_bonus[i], kernel_params)
+    return calculated
+
+
+@njit(parallel=True, cache=True)
+def _reimbursement_batch_grad(days, miles, receipts, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                              kernel_params):
+    """
+    Evaluates _reimbursement_kernel_grad over every case in parallel.
+
+    Returns (calculated, grads), where grads has one row of KERNEL_RATE_KEYS-ordered
+    gradients per case.
+    """
+    calculated = np.empty(days.shape[0])
+    grads = np.empty((days.shape[0], kernel_params.shape[0]))
+    for i in prange(days.shape[0]):
+        calculated[i] = _reimbursement_kernel_grad(days[i], miles[i], receipts[i], miles_per_day[i],
+                                                   spending_per_day[i], trip_class[i], cents_bonus[i],
+                                                   kernel_params, grads[i])
+    return calculated, grads
+
+
+@njit(parallel=True, cache=True)
+def _batch_eval(days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                kernel_params):
+    """
+    Evaluates _reimbursement_kernel over every case and reduces the errors in the same pass.
+
+    Returns (total_absolute_error, exact_matches, unstable), where unstable is True if
+    any reimbursement is not finite or negative. Cases are evaluated in parallel but
+    summed serially, so the total does not depend on the number of threads.
+    """
+    errors = np.empty(days.shape[0])
+    for i in prange(days.shape[0]):
+        calculated = _reimbursement_kernel(days[i], miles[i], receipts[i], miles_per_day[i], spending_per_day[i],
+                                           trip_class[i], cents_bonus[i], kernel_params)
+        if np.isfinite(calculated) and calculated >= 0:
+            errors[i] = abs(calculated - expected[i])
+        else:
+            errors[i] = np.inf
+
+    total_absolute_error = 0.0
+    exact_matches = 0
+    for i in range(errors.shape[0]):
+        total_absolute_error += errors[i]
+        if errors[i] < 0.01:
+            exact_matches += 1
+    return total_absolute_error, exact_matches, not np.isfinite(total_absolute_error)
+
+
+@njit(parallel=True, cache=True)
+def _batch_eval_grad(days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                     kernel_params):
+    """
+    _batch_eval that also returns the gradient of the total absolute error.
+
+    Returns (total_absolute_error, exact_matches, unstable, grad) with grad in
+    KERNEL_RATE_KEYS order; each case contributes sign(error) times its reimbursement
+    gradient. Reductions are serial for the same reason as in _batch_eval.
+    """
+    errors = np.empty(days.shape[0])
+    case_grads = np.empty((days.shape[0], kernel_params.shape[0]))
+    for i in prange(days.shape[0]):
+        calculated = _reimbursement_kernel_grad(days[i], miles[i], receipts[i], miles_per_day[i], spending_per_day[i],
+                                                trip_class[i], cents_bonus[i], kernel_params, case_grads[i])
+        if np.isfinite(calculated) and calculated >= 0:
+            errors[i] = abs(calculated - expected[i])
+            case_grads[i] *= np.sign(calculated - expected[i])
+        else:
+            errors[i] = np.inf
+
+    total_absolute_error = 0.0
+    exact_matches = 0
+    grad = np.zeros(kernel_params.shape[0])
+    for i in range(errors.shape[0]):
+        total_absolute_error += errors[i]
+        if errors[i] < 0.01:
+            exact_matches += 1
+        grad += case_grads[i]
+    return total_absolute_error, exact_matches, not np.isfinite(total_absolute_error), grad
+
+
+@njit(parallel=True, cache=True)
+def _population_eval(days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                     population_params):
+    """
+    _batch_eval for each row of kernel parameters, with the candidates in parallel.
+
+    Returns per-candidate arrays (total_absolute_error, exact_matches, unstable). Each
+    candidate's cases are reduced serially in the same order as _batch_eval, so the
+    totals match it exactly, and no (candidates, cases) result matrix is materialized.
+    """
+    num_candidates = population_params.shape[0]
+    total_absolute_error = np.zeros(num_candidates)
+    exact_matches = np.zeros(num_candidates, dtype=np.int64)
+    unstable = np.zeros(num_candidates, dtype=np.bool_)
+    for j in prange(num_candidates):
+        params = population_params[j]
+        candidate_error = 0.0
+        candidate_exact = 0
+        for i in range(days.shape[0]):
+            calculated = _reimbursement_kernel(days[i], miles[i], receipts[i], miles_per_day[i], spending_per_day[i],
+                                               trip_class[i], cents_bonus[i], params)
+            if np.isfinite(calculated) and calculated >= 0:
+                error = abs(calculated - expected[i])
+            else:
+                error = np.inf
+            candidate_error += error
+            if error < 0.01:
+                candidate_exact += 1
+        total_absolute_error[j] = candidate_error
+        exact_matches[j] = candidate_exact
+        unstable[j] = not np.isfinite(candidate_error)
+    return total_absolute_error, exact_matches, unstable
+
+
+@functools.lru_cache(maxsize=None)
+def kernel_params(R):
+    """
+    Returns the Rates tuple's values as a float array in KERNEL_RATE_KEYS order.
+
+    The array is cached per Rates tuple and shared, so callers must not modify it.
+    """
+    params = np.array(_kernel_rates(R), dtype=np.float64)
+    params.flags.writeable = False
+    return params
+
+
+def substitute_kernel_params(new_constants, initial_rates_config):
+    """
+    Returns the kernel parameters of initial_rates_config with the optimizer's values substituted.
+
+    Copies the cached base array once and scatters new_constants (ordered like
+    CONSTANTS_TO_OPTIMIZE) into their kernel positions in a single indexed assignment.
+    Day-count constants are rounded to whole days (see OPTIMIZED_DAY_KERNEL_POSITIONS).
+    """
+    params = kernel_params(initial_rates_config).copy()
+    params[OPTIMIZED_KERNEL_POSITIONS] = new_constants
+    params[OPTIMIZED_DAY_KERNEL_POSITIONS] = np.round(params[OPTIMIZED_DAY_KERNEL_POSITIONS])
+    return params
+
+
+def substitute_rates(new_constants, initial_rates_config):
+    """
+    Returns initial_rates_config with the optimizer's values substituted, as a Rates tuple.
+
+    The Rates counterpart of substitute_kernel_params, for calculate_reimbursement:
+    day-count constants are rounded to whole days the same way.
+    """
+    return initial_rates_config._replace(**{
+        key: int(round(value)) if key in DAY_COUNT_KEYS else float(value)
+        for key, value in zip(CONSTANTS_TO_OPTIMIZE, new_constants)
+    })
+
+
+def constraint_penalty(new_constants):
+    """
+    Penalty for parameter combinations that break the model's logical relationships.
+
+    new_constants is ordered like CONSTANTS_TO_OPTIMIZE, either as one vector or as a
+    (len(CONSTANTS_TO_OPTIMIZE), S) population, in which case one penalty per column is returned.
+    """
+    # Look up the optimizer's values by position rather than building a rates mapping
+    def constant(key):
+        return new_constants[OPTIMIZED_INDEX[key]]
 
     # Mileage rates should be decreasing (tier1 >= tier2)
-    if current_rates["MILEAGE_RATE_TIER1"] < current_rates["MILEAGE_RATE_TIER2"]:
-        penalty += 100
+    penalty = 100 * (constant("MILEAGE_RATE_TIER1") < constant("MILEAGE_RATE_TIER2"))
 
     # Spending thresholds should make sense (short <= medium, but long can be different)
-    if current_rates["OPTIMAL_SPENDING_SHORT_TRIP_MAX"] > current_rates["OPTIMAL_SPENDING_MEDIUM_TRIP_MAX"]:
-        penalty += 50
+    penalty += 50 * (constant("OPTIMAL_SPENDING_SHORT_TRIP_MAX") > constant("OPTIMAL_SPENDING_MEDIUM_TRIP_MAX"))
 
     # Efficiency sweet spot should be a valid range
-    if current_rates["MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN"] >= current_rates["MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX"]:
-        penalty += 50
+    penalty += 50 * (constant("MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MIN") >= constant("MILES_PER_DAY_EFFICIENCY_SWEET_SPOT_MAX"))
 
-    # Temporarily override the global configuration for the calculation
-    import calculate_reimbursement as cr
-    original_rates = cr.REIMBURSEMENT_RATES
-    cr.REIMBURSEMENT_RATES = current_rates
+    return penalty
 
-    try:
-        total_absolute_error = 0
-        exact_matches = 0
 
-        for _, row in data.iterrows():
-            # Unpack row data
-            days = int(row['trip_duration_days'])
-            miles = float(row['miles_traveled'])
-            receipts = float(row['total_receipts_amount'])
-            expected_reimbursement = float(row['expected_reimbursement'])
+def evaluation_stats(new_constants, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                     initial_rates_config):
+    """
+    Counts for the eval.sh report, from one compiled pass over the cases.
 
-            # Calculate reimbursement with the current set of constants
-            calculated_reimbursement = cr.calculate_reimbursement(days, miles, receipts)
+    Returns a dict with successful_runs, total_absolute_error, exact_matches and
+    close_matches, for reporting a final result.
+    """
+    # Keep the per-case results to also count close matches and failed runs
+    params = substitute_kernel_params(new_constants, initial_rates_config)
+    calculated = _reimbursement_batch(days, miles, receipts, miles_per_day, spending_per_day, trip_class,
+                                      cents_bonus, params)
+    successful = np.isfinite(calculated) & (calculated >= 0)
+    errors = np.abs(calculated[successful] - expected[successful])
+    return {
+        "successful_runs": int(np.count_nonzero(successful)),
+        "total_absolute_error": float(errors.sum()),
+        "exact_matches": int(np.count_nonzero(errors < 0.01)),
+        "close_matches": int(np.count_nonzero(errors < 1.0)),
+    }
 
-            # Check for numerical instability
-            if not np.isfinite(calculated_reimbursement) or calculated_reimbursement < 0:
-                return 1e12
 
-            # Calculate absolute error (matches eval.sh exactly)
-            error = abs(calculated_reimbursement - expected_reimbursement)
-            total_absolute_error += error
+def objective_function(new_constants, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                       initial_rates_config, penalty_weight=0.01):
+    """
+    Objective function that matches eval.sh calculation exactly.
+    """
+    # Add constraint penalties for logical relationships (much smaller weight)
+    penalty = constraint_penalty(new_constants)
 
-            # Count exact matches (within $0.01)
-            if error < 0.01:
-                exact_matches += 1
+    try:
+        # Calculate absolute errors (matches eval.sh exactly) and count exact matches
+        # (within $0.01) for every case in one compiled pass
+        params = substitute_kernel_params(new_constants, initial_rates_config)
+        total_absolute_error, exact_matches, unstable = _batch_eval(
+            days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus, params)
+
+        # Check for numerical instability
+        if unstable:
+            return 1e12
 
         # Calculate score exactly like eval.sh:
         # score = avg_error * 100 + (num_cases - exact_matches) * 0.1
-        num_cases = len(data)
+        num_cases = len(expected)
         avg_error = total_absolute_error / num_cases
         eval_script_score = avg_error * 100 + (num_cases - exact_matches) * 0.1
 
@@ -141,69 +591,203 @@ def objective_function(new_constants, data, initial_rates_config, penalty_weight
     except (OverflowError, ValueError, ZeroDivisionError) as e:
         return 1e12
 
-    finally:
-        # Restore the original rates to avoid side effects
-        cr.REIMBURSEMENT_RATES = original_rates
-
     if not np.isfinite(final_score):
         return 1e12
 
     return final_score
 
 
-def run_optimization_strategy(strategy_name, data, initial_rates_config, initial_guess, bounds):
-    """Run a specific optimization strategy."""
+def objective_and_gradient(new_constants, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                           initial_rates_config, penalty_weight=0.01):
+    """
+    objective_function together with its analytic (sub)gradient, for minimize(jac=True).
+
+    Only the average-error term has a nonzero gradient: the exact-match count and the
+    constraint penalties are piecewise constant in the parameters.
+    """
+    penalty = constraint_penalty(new_constants)
+
+    params = substitute_kernel_params(new_constants, initial_rates_config)
+    total_absolute_error, exact_matches, unstable, kernel_grad = _batch_eval_grad(
+        days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus, params)
+
+    num_cases = len(expected)
+    final_score = (total_absolute_error / num_cases * 100 + (num_cases - exact_matches) * 0.1
+                   + penalty * penalty_weight)
+    if unstable or not np.isfinite(final_score):
+        return 1e12, np.zeros(len(CONSTANTS_TO_OPTIMIZE))
+
+    return final_score, kernel_grad[OPTIMIZED_KERNEL_POSITIONS] * (100 / num_cases)
+
+
+def residuals_function(new_constants, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                       initial_rates_config):
+    """
+    Per-case residuals (calculated - expected) for least-squares style optimizers.
+
+    Unlike objective_function this returns the whole residual vector, letting
+    scipy.optimize.least_squares build its Jacobian from batched evaluations.
+    """
+    params = substitute_kernel_params(new_constants, initial_rates_config)
+    calculated = _reimbursement_batch(days, miles, receipts, miles_per_day, spending_per_day, trip_class,
+                                      cents_bonus, params)
+    return calculated - expected
+
+
+def population_objective(population, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus,
+                         initial_rates_config, penalty_weight=0.01):
+    """
+    objective_function for a whole population at once, for differential_evolution(vectorized=True).
+
+    population has shape (len(CONSTANTS_TO_OPTIMIZE), S) and one score per column is
+    returned; a single parameter vector (as used when polishing) gives a single score.
+    """
+    population = np.asarray(population, dtype=np.float64)
+    single = population.ndim == 1
+    population = population.reshape(len(CONSTANTS_TO_OPTIMIZE), -1)
+
+    params = np.tile(kernel_params(initial_rates_config), (population.shape[1], 1))
+    params[:, OPTIMIZED_KERNEL_POSITIONS] = population.T
+    params[:, OPTIMIZED_DAY_KERNEL_POSITIONS] = np.round(params[:, OPTIMIZED_DAY_KERNEL_POSITIONS])
+    total_absolute_error, exact_matches, unstable = _population_eval(
+        days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class, cents_bonus, params)
+
+    # Same eval.sh score as objective_function, one per candidate
+    num_cases = len(expected)
+    avg_error = total_absolute_error / num_cases
+    scores = avg_error * 100 + (num_cases - exact_matches) * 0.1 + constraint_penalty(population) * penalty_weight
+
+    # Numerically unstable candidates get the same flat score as in objective_function
+    scores[unstable | ~np.isfinite(scores)] = 1e12
+
+    return scores[0] if single else scores
+
+
+def scalar_model_difference(new_constants, days, miles, receipts, expected, miles_per_day, spending_per_day, trip_class,
+                            cents_bonus, initial_rates_config):
+    """
+    Largest absolute difference between the compiled kernels and calculate_reimbursement over the cases.
+
+    Both _reimbursement_kernel and _reimbursement_kernel_grad (whose value is the score
+    the gradient-based strategies minimize) are hand-written ports of the scalar model
+    that run.sh ships, so this is what catches them drifting apart. Runs the scalar model
+    once per case, so it is meant for checking a final result, not for use inside the
+    optimization loop.
+    """
+    params = substitute_kernel_params(new_constants, initial_rates_config)
+    compiled = _reimbursement_batch(days, miles, receipts, miles_per_day, spending_per_day, trip_class,
+                                    cents_bonus, params)
+    compiled_grad, _ = _reimbursement_batch_grad(days, miles, receipts, miles_per_day, spending_per_day, trip_class,
+                                                 cents_bonus, params)
+    rates = substitute_rates(new_constants, initial_rates_config)
+    scalar = np.fromiter((calculate_reimbursement(int(d), float(m), float(r), rates=rates)
+                          for d, m, r in zip(days, miles, receipts)), dtype=np.float64, count=len(days))
+    return float(max(np.max(np.abs(compiled - scalar), initial=0.0),
+                     np.max(np.abs(compiled_grad - scalar), initial=0.0)))
+
+
+def _init_pool_worker():
+    """
+    Pool initializer: run the batch kernel single-threaded inside worker processes.
+
+    The pool already spreads the work across cores, so letting every worker also
+    start one kernel thread per core would oversubscribe the machine.
+    """
+    set_num_threads(1)
+
+
+def _run_lbfgs(start, cases, initial_rates_config, bounds):
+    """Runs one L-BFGS-B descent from start; module-level so worker processes can unpickle it."""
+    return minimize(
+        objective_and_gradient,
+        start,
+        args=(*cases, initial_rates_config),
+        jac=True,
+        method='L-BFGS-B',
+        bounds=bounds,
+        options={'disp': False, 'maxiter': 2000, 'ftol': 1e-9}
+    )
+
+
+def multi_start_points(initial_guess, bounds, num_starts, seed=42):
+    """
+    Returns initial_guess followed by num_starts - 1 Latin-hypercube samples of the bounds.
+
+    Latin-hypercube sampling spreads the starts evenly along every parameter, so the
+    descents land on different plateaus of the step-shaped objective.
+    """
+    lower, upper = zip(*bounds)
+    sample = qmc.LatinHypercube(d=len(bounds), seed=seed).random(num_starts - 1)
+    return [np.asarray(initial_guess, dtype=np.float64), *qmc.scale(sample, lower, upper)]
+
+
+def run_optimization_strategy(strategy_name, cases, initial_rates_config, initial_guess, bounds, pool=None):
+    """
+    Run a specific optimization strategy.
+
+    Strategies made of independent runs spread them over pool (a multiprocessing.Pool)
+    when one is given, and run them one after another otherwise.
+    """
+    map_runs = pool.map if pool is not None else map
     print(f"\n--- Running {strategy_name} ---")
 
     if strategy_name == "L-BFGS-B":
+        # Analytic gradient instead of finite differences (one evaluation per step)
         result = minimize(
-            objective_function,
+            objective_and_gradient,
             initial_guess,
-            args=(data, initial_rates_config),
+            args=(*cases, initial_rates_config),
+            jac=True,
             method='L-BFGS-B',
             bounds=bounds,
             options={'disp': False, 'maxiter': 2000, 'ftol': 1e-9}
         )
 
+    elif strategy_name == "Multi-Start L-BFGS-B":
+        # Independent local descents from spread-out starts, spread over the worker pool.
+        # Unlike a basin-hopping chain, no descent waits on the previous one.
+        starts = multi_start_points(initial_guess, bounds, num_starts=50)
+        run_from = functools.partial(_run_lbfgs, cases=cases, initial_rates_config=initial_rates_config,
+                                     bounds=bounds)
+        results = list(map_runs(run_from, starts))
+        result = min(results, key=lambda r: r.fun)
+
     elif strategy_name == "Differential Evolution":
+        # Score each generation's whole population in one call; the compiled kernel
+        # spreads the candidates across cores, so no process pool is needed.
+        # No polishing: the local strategies that follow start from this result.
+        # A generation costs milliseconds, and on this objective more generations of a
+        # smaller population (8 * 24 rounded up to 256 Sobol points) beat a larger one.
         result = differential_evolution(
-            objective_function,
+            population_objective,
             bounds,
-            args=(data, initial_rates_config),
+            args=(*cases, initial_rates_config),
             seed=42,
-            maxiter=300,
-            popsize=15,
-            atol=1e-8,
+            maxiter=600,
+            popsize=8,
+            init='sobol',
+            tol=1e-7,
+            atol=1e-9,
+            polish=False,
+            vectorized=True,
+            updating='deferred',
             disp=False
         )
 
-    elif strategy_name == "Basin Hopping":
-        # Use L-BFGS-B as the local minimizer for basin hopping
-        minimizer_kwargs = {
-            "method": "L-BFGS-B",
-            "bounds": bounds,
-            "args": (data, initial_rates_config),
-            "options": {"maxiter": 500}
-        }
-        result = basinhopping(
-            objective_function,
-            initial_guess,
-            minimizer_kwargs=minimizer_kwargs,
-            niter=50,
-            T=10.0,
-            stepsize=0.1,
-            disp=False
-        )
-
-    elif strategy_name == "SLSQP":
-        result = minimize(
-            objective_function,
+    elif strategy_name == "Least Squares":
+        # Robust (soft L1) loss approximates the absolute error that eval.sh scores
+        lower, upper = zip(*bounds)
+        result = least_squares(
+            residuals_function,
             initial_guess,
-            args=(data, initial_rates_config),
-            method='SLSQP',
-            bounds=bounds,
-            options={'disp': False, 'maxiter': 1000, 'ftol': 1e-9}
+            args=(*cases, initial_rates_config),
+            bounds=(lower, upper),
+            method='trf',
+            loss='soft_l1',
+            jac='2-point'
         )
+        # Report the eval.sh score like the other strategies instead of the residual vector
+        result.fun = objective_function(result.x, *cases, initial_rates_config)
 
     print(f"{strategy_name} - Final error: {result.fun:.2f}")
     print(f"{strategy_name} - Success: {result.success}")
@@ -215,11 +799,15 @@ def main():
     """Main function to run multiple optimization strategies."""
     # Load the ground truth data
     print(f"Loading data from {DATA_FILE}...")
-    data = load_data(DATA_FILE)
-    print(f"Data loaded successfully. {len(data)} test cases.")
+    days, miles, receipts, expected = load_data(DATA_FILE)
+    num_cases = len(expected)
+    print(f"Data loaded successfully. {num_cases} test cases.")
+
+    # Compute per-row invariants once so the objective only does rate-dependent work
+    cases = (days, miles, receipts, expected, *case_features(days, miles, receipts, RATES))
 
     # Get the initial guess from the existing configuration file
-    initial_guess = [REIMBURSEMENT_RATES[k] for k in CONSTANTS_TO_OPTIMIZE]
+    initial_guess = [getattr(RATES, k) for k in CONSTANTS_TO_OPTIMIZE]
 
     # Define refined bounds based on interview insights and logical constraints
     bounds_map = {
@@ -265,25 +853,35 @@ def main():
     strategies = [
         "Differential Evolution",  # Global optimizer - good for exploration
         "L-BFGS-B",               # Local optimizer - good for refinement
-        "Basin Hopping",          # Global + local - good for escaping local minima
-        "SLSQP",                  # Alternative local optimizer
+        "Multi-Start L-BFGS-B",   # Parallel local descents from Latin-hypercube starts
+        "Least Squares",          # Robust-loss local optimizer on per-case residuals
     ]
 
     best_result = None
     best_error = float('inf')
 
-    for strategy in strategies:
-        try:
-            result = run_optimization_strategy(strategy, data, REIMBURSEMENT_RATES, initial_guess, bounds)
-
-            if result.success and result.fun < best_error:
-                best_error = result.fun
-                best_result = result
-                print(f"*** New best result from {strategy}: {best_error:.2f} ***")
-
-        except Exception as e:
-            print(f"Strategy {strategy} failed: {e}")
-            continue
+    # Each strategy starts from the best result so far instead of starting over
+    start_point = initial_guess
+
+    # One worker pool shared by every strategy, so workers are spawned (and import Numba
+    # and load the compiled kernels) only once. Spawned rather than forked: Numba's
+    # threading layer does not survive a fork once the parallel kernel has run here.
+    with multiprocessing.get_context("spawn").Pool(initializer=_init_pool_worker) as pool:
+        for strategy in strategies:
+            try:
+                result = run_optimization_strategy(strategy, cases, RATES, start_point, bounds, pool=pool)
+
+                # result.fun is the score at result.x even when the optimizer stopped on its
+                # iteration limit or a failed line search, so compare scores, not success flags
+                if result.fun < best_error:
+                    best_error = result.fun
+                    best_result = result
+                    start_point = result.x
+                    print(f"*** New best result from {strategy}: {best_error:.2f} ***")
+
+            except Exception as e:
+                print(f"Strategy {strategy} failed: {e}")
+                continue
 
     if best_result is not None:
         print(f"\n=== BEST OPTIMIZATION RESULT ===")
@@ -294,54 +892,28 @@ def main():
         print("\n# Optimized constants for calculate_reimbursement.py:")
         for i, key in enumerate(CONSTANTS_TO_OPTIMIZE):
             # For integer-like constants, round the result
-            if "DAYS" in key:
+            if key in DAY_COUNT_KEYS:
                 print(f'    "{key}": {int(round(optimized_constants[i]))},')
             else:
                 print(f'    "{key}": {optimized_constants[i]:.4f},')
 
         # Test the optimized constants
         print(f"\n=== TESTING OPTIMIZED CONSTANTS ===")
-        import calculate_reimbursement as cr
-        original_rates = cr.REIMBURSEMENT_RATES.copy()
-
-        # Apply optimized constants
-        for i, key in enumerate(CONSTANTS_TO_OPTIMIZE):
-            cr.REIMBURSEMENT_RATES[key] = optimized_constants[i]
-
-        # Calculate final error exactly like eval.sh
-        total_absolute_error = 0
-        exact_matches = 0
-        close_matches = 0
-        successful_runs = 0
-
-        for _, row in data.iterrows():
-            calculated = cr.calculate_reimbursement(
-                int(row['trip_duration_days']),
-                float(row['miles_traveled']),
-                float(row['total_receipts_amount'])
-            )
-            expected = float(row['expected_reimbursement'])
-
-            if np.isfinite(calculated) and calculated >= 0:
-                successful_runs += 1
-                error = abs(calculated - expected)
-                total_absolute_error += error
-
-                # Count exact matches (within $0.01)
-                if error < 0.01:
-                    exact_matches += 1
 
-                # Count close matches (within $1.00)
-                if error < 1.0:
-                    close_matches += 1
+        # Calculate final error exactly like eval.sh, in one batched pass
+        stats = evaluation_stats(optimized_constants, *cases, RATES)
+        total_absolute_error = stats["total_absolute_error"]
+        exact_matches = stats["exact_matches"]
+        close_matches = stats["close_matches"]
+        successful_runs = stats["successful_runs"]
 
         # Calculate metrics exactly like eval.sh
         avg_error = total_absolute_error / successful_runs if successful_runs > 0 else float('inf')
         exact_pct = (exact_matches * 100 / successful_runs) if successful_runs > 0 else 0
         close_pct = (close_matches * 100 / successful_runs) if successful_runs > 0 else 0
-        eval_score = avg_error * 100 + (len(data) - exact_matches) * 0.1
+        eval_score = avg_error * 100 + (num_cases - exact_matches) * 0.1
 
-        print(f"Total test cases: {len(data)}")
+        print(f"Total test cases: {num_cases}")
         print(f"Successful runs: {successful_runs}")
         print(f"Exact matches (±$0.01): {exact_matches} ({exact_pct:.1f}%)")
         print(f"Close matches (±$1.00): {close_matches} ({close_pct:.1f}%)")
@@ -349,8 +921,13 @@ def main():
         print(f"Eval.sh Score: {eval_score:.2f} (lower is better)")
         print(f"Verification: Total absolute error = {total_absolute_error:.2f}")
 
-        # Restore original rates
-        cr.REIMBURSEMENT_RATES = original_rates
+        # The figures above come from the compiled kernels; check that the scalar model
+        # run.sh uses gives the same reimbursements with the optimized constants
+        max_difference = scalar_model_difference(optimized_constants, *cases, RATES)
+        print(f"Scalar model check: max |calculate_reimbursement - kernels| = {max_difference:.2e}")
+        if not max_difference < 1e-6:
+            raise RuntimeError(f"calculate_reimbursement and the compiled kernels differ by up to {max_difference:.6g} "
+                               "with the optimized constants; bring the kernels back in sync with it")
 
     else:
         print("\nAll optimization strategies failed.")